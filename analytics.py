@@ -0,0 +1,332 @@
+import numpy as np
+
+
+# Marginal abatement cost curve in merit order. Values are USD/t CO2 and
+# widths Mt CO2, so per-intervention costs come out in million USD.
+def macc_curve(values, widths, sort=True):
+    values = np.asarray(values, dtype=float)
+    widths = np.asarray(widths, dtype=float)
+    order = np.argsort(values) if sort else np.arange(len(values))
+    values = values[order]
+    widths = widths[order]
+    costs = values * widths
+    cumulative_abatement = np.cumsum(widths)
+    return {
+        "order": order,
+        "sorted": sort or bool(np.all(values[1:] >= values[:-1])),
+        "values": values,
+        "widths": widths,
+        "x": cumulative_abatement - widths,
+        "costs": costs,
+        "cumulative_abatement": cumulative_abatement,
+        "cumulative_cost": np.cumsum(costs),
+    }
+
+
+# Abatement reached before the cumulative cost of the sorted curve turns
+# positive again, interpolated inside the bar where it crosses zero.
+def break_even_abatement(curve):
+    cumulative_cost = curve["cumulative_cost"]
+    if not len(cumulative_cost) or cumulative_cost[0] > 0:
+        return 0.0
+    lowest = int(np.argmin(cumulative_cost))
+    positive = np.flatnonzero(cumulative_cost[lowest:] > 0)
+    if not len(positive):
+        return float(curve["cumulative_abatement"][-1])
+    crossing = lowest + positive[0]
+    before = cumulative_cost[crossing - 1]
+    fraction = -before / curve["costs"][crossing]
+    return float(curve["x"][crossing] + fraction * curve["widths"][crossing])
+
+
+def macc_summary(curve, line_value=None):
+    values = curve["values"]
+    costs = curve["costs"]
+    summary = {
+        "interventions": int(len(values)),
+        "total_abatement": float(curve["widths"].sum()),
+        "total_cost": float(costs.sum()),
+        "total_savings": float(-costs[costs < 0].sum()),
+        "total_spend": float(costs[costs > 0].sum()),
+        "negative_cost_abatement": float(curve["widths"][values < 0].sum()),
+        "break_even_abatement": break_even_abatement(curve) if curve["sorted"] else None,
+    }
+    if line_value is not None:
+        if curve["sorted"]:
+            # Everything below the price is a prefix of the sorted curve
+            count = int(np.searchsorted(values, line_value, side='right'))
+            summary["abatement_below_price"] = float(curve["cumulative_abatement"][count - 1]) if count else 0.0
+            summary["cost_below_price"] = float(curve["cumulative_cost"][count - 1]) if count else 0.0
+        else:
+            below = values <= line_value
+            summary["abatement_below_price"] = float(curve["widths"][below].sum())
+            summary["cost_below_price"] = float(costs[below].sum())
+    return summary
+
+
+# Curves for every year of a trajectory at once. Inputs are (intervention x
+# year) arrays; each column is sorted into merit order independently and the
+# cumulative sums run down the intervention axis.
+def macc_trajectory(values, widths):
+    values = np.asarray(values, dtype=float)
+    widths = np.asarray(widths, dtype=float)
+    order = np.argsort(values, axis=0)
+    values = np.take_along_axis(values, order, axis=0)
+    widths = np.take_along_axis(widths, order, axis=0)
+    costs = values * widths
+    cumulative_abatement = np.cumsum(widths, axis=0)
+    return {
+        "order": order,
+        "values": values,
+        "widths": widths,
+        "x": cumulative_abatement - widths,
+        "costs": costs,
+        "cumulative_abatement": cumulative_abatement,
+        "cumulative_cost": np.cumsum(costs, axis=0),
+    }
+
+
+# Per-year totals of a trajectory, plus what is achievable at the carbon price
+def trajectory_summary(curve, line_value=None):
+    summary = {
+        "total_abatement": curve["widths"].sum(axis=0),
+        "total_cost": curve["costs"].sum(axis=0),
+    }
+    if line_value is not None:
+        below = curve["values"] <= line_value
+        summary["abatement_below_price"] = np.where(below, curve["widths"], 0.0).sum(axis=0)
+        summary["cost_below_price"] = np.where(below, curve["costs"], 0.0).sum(axis=0)
+    return summary
+
+
+# Capital recovery factor: spreads an up-front cost over `lifetime` equal
+# annual payments at `discount_rate` (a fraction, e.g. 0.08).
+def capital_recovery_factor(discount_rate, lifetime):
+    discount_rate = np.asarray(discount_rate, dtype=float)
+    lifetime = np.asarray(lifetime, dtype=float)
+    growth = (1 + discount_rate) ** lifetime
+    with np.errstate(divide='ignore', invalid='ignore'):
+        crf = discount_rate * growth / (growth - 1)
+    return np.where(discount_rate == 0, 1 / lifetime, crf)
+
+
+# Levelized abatement cost of every intervention in one pass. Capex is in
+# million USD, opex in million USD per year (negative for net savings) and
+# abatement in Mt CO2 per year, so the cost comes out in USD/t CO2. Scalars
+# broadcast, e.g. one discount rate for the whole portfolio.
+def levelized_costs(capex, opex, lifetime, discount_rate, annual_abatement):
+    capex, opex, lifetime, discount_rate, annual_abatement = np.broadcast_arrays(
+        *(np.asarray(column, dtype=float) for column in (capex, opex, lifetime, discount_rate, annual_abatement)))
+    if np.any(lifetime <= 0) or np.any(annual_abatement <= 0) or np.any(discount_rate <= -1):
+        raise ValueError("lifetime and annual abatement must be positive and the discount rate above -100%")
+    annualized_cost = capex * capital_recovery_factor(discount_rate, lifetime) + opex
+    return {
+        "values": annualized_cost / annual_abatement,
+        "widths": annual_abatement,
+        "annualized_cost": annualized_cost,
+    }
+
+
+# Abatement and cost achievable at every carbon price in one pass: each price
+# selects a prefix of the sorted curve, found with a vectorized binary search.
+def price_sweep(values, widths, prices):
+    curve = macc_curve(values, widths)
+    prices = np.asarray(prices, dtype=float)
+    counts = np.searchsorted(curve["values"], prices, side='right')
+    return {
+        "prices": prices,
+        "abatement": np.concatenate(([0.0], curve["cumulative_abatement"]))[counts],
+        "cost": np.concatenate(([0.0], curve["cumulative_cost"]))[counts],
+    }
+
+
+MC_BINS = 4096
+MC_CHUNK_ELEMENTS = 2_000_000
+MC_PERCENTILES = (5, 25, 50, 75, 95)
+
+
+# Vectorized triangular sampling by inverse CDF; degenerate ranges return low
+def sample_triangular(rng, low, mode, high, size):
+    span = high - low
+    safe_span = np.where(span > 0, span, 1.0)
+    split = (mode - low) / safe_span
+    u = rng.random(size)
+    lower = low + np.sqrt(u * span * (mode - low))
+    upper = high - np.sqrt((1 - u) * span * (high - mode))
+    return np.where(u < split, lower, upper)
+
+
+def sample_ranges(rng, low, mode, high, size, distribution):
+    if distribution == 'triangular':
+        return sample_triangular(rng, low, mode, high, size)
+    return low + (high - low) * rng.random(size)
+
+
+# One chunk of samples reduced to fixed-size histograms, so memory depends on
+# the chunk size and never on the total number of samples.
+def monte_carlo_chunk(task):
+    ranges, line_value, samples, seed, bounds, distribution = task
+    rng = np.random.default_rng(seed)
+    size = (samples, len(ranges["value_low"]))
+    values = sample_ranges(rng, ranges["value_low"], ranges["value_mode"], ranges["value_high"], size, distribution)
+    widths = sample_ranges(rng, ranges["width_low"], ranges["width_mode"], ranges["width_high"], size, distribution)
+    below = values <= line_value
+    abatement = np.where(below, widths, 0.0).sum(axis=1)
+    cost = np.where(below, values * widths, 0.0).sum(axis=1)
+    return {
+        "abatement": np.histogram(abatement, MC_BINS, range=bounds["abatement"])[0],
+        "cost": np.histogram(cost, MC_BINS, range=bounds["cost"])[0],
+        "abatement_sum": float(abatement.sum()),
+        "cost_sum": float(cost.sum()),
+        "samples": samples,
+    }
+
+
+def histogram_percentiles(counts, value_range, percentiles):
+    edges = np.linspace(value_range[0], value_range[1], len(counts) + 1)
+    cumulative = np.concatenate(([0], np.cumsum(counts)))
+    targets = np.asarray(percentiles, dtype=float) / 100 * cumulative[-1]
+    return np.interp(targets, cumulative, edges)
+
+
+# Monte Carlo over per-intervention value/width ranges: distribution of the
+# abatement and cost achievable at the internal carbon price. map_chunks lets
+# the caller spread chunks over a process pool; it defaults to serial map.
+# Chunks are bounded by memory and by samples / workers, so even a run that
+# would fit in one chunk gives every pool process a share.
+def monte_carlo(ranges, line_value, samples, seed=None, distribution='uniform', map_chunks=map,
+                chunk_elements=MC_CHUNK_ELEMENTS, workers=1):
+    ranges = {name: np.asarray(column, dtype=float) for name, column in ranges.items()}
+    corners = np.stack([ranges["value_low"] * ranges["width_low"], ranges["value_low"] * ranges["width_high"],
+                        ranges["value_high"] * ranges["width_low"], ranges["value_high"] * ranges["width_high"]])
+    bounds = {
+        "abatement": (0.0, max(float(ranges["width_high"].sum()), 1e-9)),
+        "cost": (float(np.minimum(corners.min(axis=0), 0).sum()), float(np.maximum(corners.max(axis=0), 0).sum())),
+    }
+    if bounds["cost"][0] == bounds["cost"][1]:
+        bounds["cost"] = (bounds["cost"][0], bounds["cost"][0] + 1e-9)
+
+    chunk = max(1, min(chunk_elements // len(ranges["value_low"]), -(-samples // max(workers, 1))))
+    sizes = [min(chunk, samples - start) for start in range(0, samples, chunk)]
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+    tasks = [(ranges, line_value, size, chunk_seed, bounds, distribution) for size, chunk_seed in zip(sizes, seeds)]
+
+    totals = {"abatement": np.zeros(MC_BINS, dtype=np.int64), "cost": np.zeros(MC_BINS, dtype=np.int64),
+              "abatement_sum": 0.0, "cost_sum": 0.0, "samples": 0}
+    for result in map_chunks(monte_carlo_chunk, tasks):
+        for name in totals:
+            totals[name] += result[name]
+
+    summary = {"samples": totals["samples"], "line_value": line_value, "percentiles": list(MC_PERCENTILES)}
+    for name in ("abatement", "cost"):
+        summary[name] = {
+            "mean": totals[f"{name}_sum"] / totals["samples"],
+            "bands": histogram_percentiles(totals[name], bounds[name], MC_PERCENTILES).tolist(),
+            "resolution": (bounds[name][1] - bounds[name][0]) / MC_BINS,
+        }
+    return summary
+
+
+# Knapsack tables are budget steps x interventions booleans; cap their size
+OPTIMIZER_BUDGET_STEPS = 2048
+OPTIMIZER_TABLE_CELLS = 50_000_000
+
+
+# Fractional (LP relaxation) knapsack: an upper bound on the abatement any
+# portfolio within the budget can reach.
+def knapsack_upper_bound(widths, capex, budget):
+    order = np.argsort(-(widths / capex))
+    spend = np.cumsum(capex[order])
+    whole = int(np.searchsorted(spend, budget, side='right'))
+    bound = float(widths[order[:whole]].sum())
+    if whole < len(order):
+        left = budget - (spend[whole - 1] if whole else 0.0)
+        bound += float(widths[order[whole]] * left / capex[order[whole]])
+    return bound
+
+
+# Greedy by abatement per unit of capital, skipping anything that no longer fits
+def knapsack_greedy(widths, capex, budget):
+    chosen = np.zeros(len(widths), dtype=bool)
+    left = budget
+    for i in np.argsort(-(widths / capex)):
+        if capex[i] <= left:
+            chosen[i] = True
+            left -= capex[i]
+    return chosen
+
+
+# 0/1 knapsack by dynamic programming over the budget in integer steps. Costs
+# are rounded up to whole steps, so every answer is feasible; with integer
+# costs and a budget of at most `steps` the result is exact.
+def knapsack_dp(widths, capex, budget, steps):
+    if np.all(capex == np.round(capex)) and budget <= steps:
+        unit = 1.0
+    else:
+        unit = budget / steps
+    costs = np.ceil(capex / unit - 1e-9).astype(np.int64)
+    capacity = int(np.floor(budget / unit + 1e-9))
+
+    best = np.zeros(capacity + 1)
+    take = np.zeros((len(widths), capacity + 1), dtype=bool)
+    for k in range(len(widths)):
+        cost = costs[k]
+        if cost > capacity:
+            continue
+        candidate = best[:capacity + 1 - cost] + widths[k]
+        better = candidate > best[cost:]
+        take[k, cost:] = better
+        best[cost:] = np.where(better, candidate, best[cost:])
+
+    chosen = np.zeros(len(widths), dtype=bool)
+    left = capacity
+    for k in range(len(widths) - 1, -1, -1):
+        if take[k, left]:
+            chosen[k] = True
+            left -= costs[k]
+    return chosen, unit == 1.0
+
+
+# Portfolio with the most abatement whose capital cost fits the budget.
+# `include` and `exclude` are index arrays of interventions forced in or out.
+# Interventions that cost nothing (or return capital) are always taken; the
+# rest go through the knapsack DP, and the greedy solution is kept instead if
+# step rounding left the DP behind it.
+def optimize_portfolio(widths, capex, budget, include=(), exclude=(), steps=OPTIMIZER_BUDGET_STEPS):
+    widths = np.asarray(widths, dtype=float)
+    capex = np.asarray(capex, dtype=float)
+    conflicts = sorted(set(include) & set(exclude))
+    if conflicts:
+        raise ValueError(f"interventions both included and excluded: {conflicts}")
+    chosen = np.zeros(len(widths), dtype=bool)
+    chosen[list(include)] = True
+    open_ = ~chosen
+    open_[list(exclude)] = False
+
+    free = open_ & ((capex < 0) | ((capex == 0) & (widths > 0)))
+    chosen |= free
+    left = float(budget) - float(capex[chosen].sum())
+    if left < 0:
+        raise ValueError("interventions that must be included exceed the budget")
+
+    candidates = np.flatnonzero(open_ & ~free & (widths > 0) & (capex <= left))
+    exact = True
+    upper_bound = float(widths[chosen].sum())
+    if len(candidates) and left > 0:
+        steps = max(1, min(steps, OPTIMIZER_TABLE_CELLS // len(candidates)))
+        picked, exact = knapsack_dp(widths[candidates], capex[candidates], left, steps)
+        greedy = knapsack_greedy(widths[candidates], capex[candidates], left)
+        if widths[candidates][greedy].sum() > widths[candidates][picked].sum():
+            picked, exact = greedy, False
+        chosen[candidates[picked]] = True
+        upper_bound += knapsack_upper_bound(widths[candidates], capex[candidates], left)
+
+    abatement = float(widths[chosen].sum())
+    return {
+        "selected": chosen,
+        "budget": float(budget),
+        "capex": float(capex[chosen].sum()),
+        "abatement": abatement,
+        "upper_bound": max(upper_bound, abatement),
+        "exact": exact,
+    }
@@ -0,0 +1,160 @@
+import concurrent.futures
+import os
+import threading
+import time
+
+
+class ExecutorBusy(Exception):
+    pass
+
+
+def _timed_call(fn, args, submitted_at):
+    started_at = time.time()
+    result = fn(*args)
+    return result, started_at - submitted_at, time.time() - started_at
+
+
+# Fixed-size executor with admission control. At most workers + queue_size
+# jobs are admitted at once; further submissions are rejected with
+# busy_error so the web tier can answer 503 immediately. With workers=0 jobs
+# run inline on the calling thread. Subclasses supply the pool through
+# _create_executor(); it is created on first use and again after fork(), since
+# a pool inherited from the parent process does not work in the child.
+class BoundedExecutor:
+    busy_error = ExecutorBusy
+    busy_message = "Queue full ({capacity} jobs admitted)"
+
+    def __init__(self, workers, queue_size, timeout):
+        self.workers = workers
+        self.queue_size = queue_size
+        self.timeout = timeout
+        self.capacity = max(workers, 1) + queue_size
+        self._slots = threading.BoundedSemaphore(self.capacity)
+        self._executor = None
+        self._executor_pid = None
+        self._lock = threading.Lock()
+        self.submitted = 0
+        self.rejected = 0
+        self.completed = 0
+        self.failed = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+        self.total_run = 0.0
+        self.max_run = 0.0
+        self.tag_stats = {}
+
+    def _create_executor(self):
+        raise NotImplementedError
+
+    def _get_executor(self):
+        with self._lock:
+            if self._executor is None or self._executor_pid != os.getpid():
+                self._executor = self._create_executor()
+                self._executor_pid = os.getpid()
+            return self._executor
+
+    # Called with the exception of every failed job
+    def _job_failed(self, error):
+        pass
+
+    def submit(self, fn, *args, block=False, tag=None):
+        if not self._slots.acquire(blocking=block, timeout=self.timeout if block else None):
+            with self._lock:
+                self.rejected += 1
+            raise self.busy_error(self.busy_message.format(capacity=self.capacity))
+
+        with self._lock:
+            self.submitted += 1
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+
+        outer = concurrent.futures.Future()
+        submitted_at = time.time()
+        if self.workers == 0:
+            inner = concurrent.futures.Future()
+            try:
+                inner.set_result(_timed_call(fn, args, submitted_at))
+            except Exception as e:
+                inner.set_exception(e)
+            self._finished(outer, inner, tag)
+            return outer
+
+        try:
+            inner = self._get_executor().submit(_timed_call, fn, args, submitted_at)
+        except Exception as e:
+            # A pool can break while idle (a worker process killed); submit()
+            # is then the first to notice, and the subclass must hear of it
+            self._job_failed(e)
+            self._release(failed=True)
+            raise
+        inner.add_done_callback(lambda future: self._finished(outer, future, tag))
+        return outer
+
+    def _finished(self, outer, inner, tag=None):
+        try:
+            result, wait, run = inner.result()
+        except Exception as e:
+            self._job_failed(e)
+            self._release(failed=True)
+            outer.set_exception(e)
+            return
+        self._release(wait=wait, run=run)
+        if tag is not None:
+            self._record_tag(tag, wait, run, result)
+        outer.set_result(result)
+
+    def _release(self, failed=False, wait=0.0, run=0.0):
+        with self._lock:
+            self.in_flight -= 1
+            if failed:
+                self.failed += 1
+            else:
+                self.completed += 1
+                self.total_wait += wait
+                self.max_wait = max(self.max_wait, wait)
+                self.total_run += run
+                self.max_run = max(self.max_run, run)
+        self._slots.release()
+
+    # Per-tag (e.g. per output preset) wait and run time and output size
+    def _record_tag(self, tag, wait, run, result):
+        with self._lock:
+            stats = self.tag_stats.setdefault(tag, {"count": 0, "total_wait": 0.0, "total_run": 0.0,
+                                                    "max_run": 0.0, "total_bytes": 0})
+            stats["count"] += 1
+            stats["total_wait"] += wait
+            stats["total_run"] += run
+            stats["max_run"] = max(stats["max_run"], run)
+            if isinstance(result, (bytes, bytearray)):
+                stats["total_bytes"] += len(result)
+
+    def stats(self):
+        with self._lock:
+            completed = self.completed or 1
+            return {
+                "workers": self.workers,
+                "capacity": self.capacity,
+                "in_flight": self.in_flight,
+                "queued": max(0, self.in_flight - max(self.workers, 1)),
+                "max_in_flight": self.max_in_flight,
+                "submitted": self.submitted,
+                "rejected": self.rejected,
+                "completed": self.completed,
+                "failed": self.failed,
+                "avg_wait_ms": round(self.total_wait / completed * 1000, 2),
+                "max_wait_ms": round(self.max_wait * 1000, 2),
+                "avg_run_ms": round(self.total_run / completed * 1000, 2),
+                "max_run_ms": round(self.max_run * 1000, 2),
+                "by_tag": {
+                    tag: {
+                        "count": stats["count"],
+                        "avg_wait_ms": round(stats["total_wait"] / stats["count"] * 1000, 2),
+                        "avg_run_ms": round(stats["total_run"] / stats["count"] * 1000, 2),
+                        "max_run_ms": round(stats["max_run"] * 1000, 2),
+                        "avg_bytes": stats["total_bytes"] // stats["count"],
+                    }
+                    for tag, stats in self.tag_stats.items()
+                },
+            }
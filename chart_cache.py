@@ -0,0 +1,263 @@
+import colorsys
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+
+# Bump when the rendered output changes so stale entries are never served.
+RENDER_VERSION = 5
+
+
+# Deterministic bar color derived from the intervention name. Only the hue is
+# hashed so bars never come out near-white or near-black.
+def chart_color(category):
+    digest = hashlib.md5(category.strip().encode('utf-8')).digest()
+    hue = int.from_bytes(digest[:2], 'big') / 65536
+    red, green, blue = colorsys.hsv_to_rgb(hue, 0.65, 0.85)
+    return f"#{int(red * 255):02X}{int(green * 255):02X}{int(blue * 255):02X}"
+
+
+def chart_colors(categories):
+    return [chart_color(category) for category in categories]
+
+
+# Canonical form of the chart inputs; identical submissions map to the same spec
+def chart_spec(project_name, categories, values, widths, line_value=None, highlight=None):
+    spec = {
+        "version": RENDER_VERSION,
+        "project_name": project_name.strip(),
+        "categories": [category.strip() for category in categories],
+        "values": [float(value) for value in values],
+        "widths": [float(width) for width in widths],
+        "line_value": float(line_value) if line_value is not None else None,
+    }
+    # Only set for optimized portfolios, so plain charts keep their digests
+    if highlight is not None:
+        spec["highlight"] = sorted(int(i) for i in highlight)
+    return spec
+
+
+def sweep_spec(project_name, values, widths, price_min, price_max, price_steps):
+    return {
+        "version": RENDER_VERSION,
+        "kind": "sweep",
+        "project_name": project_name.strip(),
+        "values": [float(value) for value in values],
+        "widths": [float(width) for width in widths],
+        "price_min": float(price_min),
+        "price_max": float(price_max),
+        "price_steps": int(price_steps),
+    }
+
+
+# Values and widths are per intervention, one entry per year
+def trajectory_spec(project_name, categories, start_year, values, widths, line_value=None):
+    return {
+        "version": RENDER_VERSION,
+        "kind": "trajectory",
+        "project_name": project_name.strip(),
+        "categories": [category.strip() for category in categories],
+        "start_year": int(start_year),
+        "values": [[float(value) for value in row] for row in values],
+        "widths": [[float(width) for width in row] for row in widths],
+        "line_value": float(line_value) if line_value is not None else None,
+    }
+
+
+def chart_key(spec):
+    payload = json.dumps(spec, sort_keys=True, separators=(',', ':'))
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+# Cache keys for the stored spec and for one rendered size of it
+def spec_cache_key(digest):
+    return f"{digest}.json"
+
+
+def image_cache_key(digest, preset, fmt='png'):
+    return f"{digest}-{preset}.{fmt}"
+
+
+# Files in the shared directory are pruned once this share of the disk budget
+# has been written since the last prune, or after PRUNE_INTERVAL seconds
+PRUNE_WRITE_FRACTION = 0.05
+PRUNE_INTERVAL = 300
+# Pruning stops when the directory is this far under its budget
+PRUNE_TARGET = 0.9
+# Half-written files left by a crashed writer
+STALE_TMP_SECONDS = 3600
+
+
+# In-process LRU cache of rendered charts bounded by total payload size.
+# When a directory is given, entries are also written there so that every
+# worker process can serve a chart rendered by any other. The directory is
+# bounded too: files not read or written for max_age seconds are deleted,
+# and above max_disk_bytes the least recently used images go first, then specs.
+class ChartCache:
+    def __init__(self, max_bytes, directory=None, max_disk_bytes=None, max_age=None):
+        self.max_bytes = max_bytes
+        self.directory = directory
+        self.max_disk_bytes = max_disk_bytes
+        self.max_age = max_age
+        self.current_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.disk_bytes = None
+        self.disk_evictions = 0
+        self._written = 0
+        self._last_prune = time.monotonic()
+        self._prune_lock = threading.Lock()
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            data = self._entries.get(key)
+            if data is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return data
+        data = self._read(key)
+        with self._lock:
+            if data is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+        self._remember(key, data)
+        return data
+
+    def put(self, key, data):
+        self._write(key, data)
+        self._remember(key, data)
+
+    def _remember(self, key, data):
+        if len(data) > self.max_bytes:
+            return
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self.current_bytes -= len(old)
+            self._entries[key] = data
+            self.current_bytes += len(data)
+            while self.current_bytes > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self.current_bytes -= len(evicted)
+                self.evictions += 1
+
+    def _path(self, key):
+        return os.path.join(self.directory, key)
+
+    def _read(self, key):
+        if not self.directory:
+            return None
+        path = self._path(key)
+        try:
+            with open(path, 'rb') as f:
+                data = f.read()
+            # Reads keep a file young for the pruner
+            os.utime(path)
+            return data
+        except FileNotFoundError:
+            return None
+        except OSError as e:
+            logging.error(f"Failed to read cached chart {key}: {e}")
+            return None
+
+    def _write(self, key, data):
+        if not self.directory:
+            return
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=self.directory, prefix='.tmp-')
+            with os.fdopen(fd, 'wb') as f:
+                f.write(data)
+            os.replace(tmp_path, self._path(key))
+        except OSError as e:
+            logging.error(f"Failed to store chart {key}: {e}")
+            return
+        with self._lock:
+            self._written += len(data)
+            due = ((self.max_disk_bytes and self._written >= self.max_disk_bytes * PRUNE_WRITE_FRACTION)
+                   or time.monotonic() - self._last_prune >= PRUNE_INTERVAL)
+        if due:
+            self.prune()
+
+    # Applies the age and size limits to the shared directory. Every worker
+    # prunes the same directory; a file another one already removed is skipped.
+    def prune(self):
+        if not self.directory or not self._prune_lock.acquire(blocking=False):
+            return
+        try:
+            with self._lock:
+                self._written = 0
+                self._last_prune = time.monotonic()
+            try:
+                entries = [(entry.name, entry.stat()) for entry in os.scandir(self.directory) if entry.is_file()]
+            except FileNotFoundError:
+                return
+            except OSError as e:
+                logging.error(f"Failed to list chart store {self.directory}: {e}")
+                return
+
+            now = time.time()
+            kept = []
+            evicted = 0
+            for name, stat in entries:
+                age = now - stat.st_mtime
+                if name.startswith('.tmp-'):
+                    expired = age > STALE_TMP_SECONDS
+                else:
+                    expired = self.max_age is not None and age > self.max_age
+                if expired:
+                    evicted += self._remove(name)
+                elif not name.startswith('.tmp-'):
+                    kept.append((name, stat))
+
+            total = sum(stat.st_size for _, stat in kept)
+            if self.max_disk_bytes is not None and total > self.max_disk_bytes:
+                # Specs are tiny and needed to render other presets, so images go first
+                kept.sort(key=lambda item: (item[0].endswith('.json'), item[1].st_mtime))
+                target = self.max_disk_bytes * PRUNE_TARGET
+                for name, stat in kept:
+                    if total <= target:
+                        break
+                    if self._remove(name):
+                        evicted += 1
+                        total -= stat.st_size
+
+            with self._lock:
+                self.disk_bytes = total
+                self.disk_evictions += evicted
+            if evicted:
+                logging.info(f"Pruned {evicted} files from chart store, {total} bytes left")
+        finally:
+            self._prune_lock.release()
+
+    def _remove(self, name):
+        try:
+            os.remove(self._path(name))
+            return 1
+        except FileNotFoundError:
+            return 0
+        except OSError as e:
+            logging.error(f"Failed to remove cached chart {name}: {e}")
+            return 0
+
+    def stats(self):
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": self.current_bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "disk_bytes": self.disk_bytes,
+                "max_disk_bytes": self.max_disk_bytes,
+                "disk_evictions": self.disk_evictions,
+            }
@@ -0,0 +1,284 @@
+import io
+import math
+
+from matplotlib.colors import to_rgba_array
+from matplotlib.figure import Figure
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.collections import LineCollection, PolyCollection
+from matplotlib.patches import Patch
+from matplotlib.ticker import MaxNLocator
+import numpy as np
+from PIL import Image
+
+from analytics import macc_trajectory, price_sweep
+from chart_cache import chart_colors
+from presets import PRESETS, PNG_COMPRESS_LEVEL, PNG_QUANTIZE
+
+
+# Shared y range of the trajectory panels: every bar, the zero line and the
+# carbon price line, plus a 5% margin
+def trajectory_limits(values, line_value=None):
+    levels = [float(np.min(values)), float(np.max(values)), 0.0]
+    if line_value is not None:
+        levels.append(float(line_value))
+    low, high = min(levels), max(levels)
+    margin = (high - low) * 0.05 or 1.0
+    return low - margin, high + margin
+
+
+# Object-oriented MACC renderer. Every render builds its own Figure and Agg
+# canvas, so no pyplot global state is shared between threads.
+#
+# Curves longer than large_n_threshold are drawn as a single PolyCollection
+# with labels decimated to what fits on the axis, which keeps render time
+# nearly flat in the number of interventions. Budget: N=10,000 renders in
+# under 2 s at the default size on one core (see scripts/bench_render.py).
+class MaccRenderer:
+    large_n_threshold = 150
+
+    def __init__(self, figsize=(20, 25), dpi=100, fontsize=20, title_fontsize=24):
+        self.figsize = figsize
+        self.dpi = dpi
+        self.fontsize = fontsize
+        self.title_fontsize = title_fontsize
+
+    @classmethod
+    def for_preset(cls, preset):
+        return cls(**PRESETS[preset])
+
+    def new_figure(self):
+        fig = Figure(figsize=self.figsize, dpi=self.dpi)
+        FigureCanvasAgg(fig)
+        return fig
+
+    def render(self, project_name, categories, values, widths, line_value=None, colors=None, fmt='png',
+               highlight=None):
+        if colors is None:
+            colors = chart_colors(categories)
+
+        fig = self.new_figure()
+        ax = fig.add_subplot()
+        if highlight is not None:
+            colors = self.highlight_colors(colors, highlight)
+            ax.text(0.01, 0.99, f"Portfolio: {len(highlight)} of {len(values)} interventions",
+                    transform=ax.transAxes, ha='left', va='top', fontsize=self.fontsize * 0.8)
+        self.draw(ax, project_name, categories, values, widths, line_value, colors)
+        fig.subplots_adjust(bottom=0.3, right=0.95)
+        return self.encode(fig, fmt)
+
+    def render_spec(self, spec, fmt='png'):
+        if spec.get("kind") == "sweep":
+            prices = np.linspace(spec["price_min"], spec["price_max"], spec["price_steps"])
+            return self.render_sweep(spec["project_name"], spec["values"], spec["widths"], prices, fmt)
+        if spec.get("kind") == "trajectory":
+            return self.render_trajectory(spec["project_name"], spec["categories"], spec["start_year"],
+                                          spec["values"], spec["widths"], spec["line_value"], fmt)
+        return self.render(spec["project_name"], spec["categories"], spec["values"],
+                           spec["widths"], spec["line_value"], fmt=fmt, highlight=spec.get("highlight"))
+
+    # Bars outside the chosen portfolio are greyed out
+    def highlight_colors(self, colors, highlight):
+        chosen = set(highlight)
+        return [color if i in chosen else '#D9D9D9' for i, color in enumerate(colors)]
+
+    def draw(self, ax, project_name, categories, values, widths, line_value, colors):
+        fontsize = self.fontsize
+        values = np.asarray(values, dtype=float)
+        widths = np.asarray(widths, dtype=float)
+        total_abatement = widths.sum()
+        x_positions = np.concatenate(([0.0], np.cumsum(widths[:-1])))
+        centers = x_positions + widths / 2
+
+        if len(values) > self.large_n_threshold:
+            self.draw_bar_collection(ax, x_positions, values, widths, colors)
+            labelled = self.legible_labels(ax, centers, widths)
+            ax.text(0.99, 0.99, f"Labels shown for {len(labelled)} of {len(values)} interventions",
+                    transform=ax.transAxes, ha='right', va='top', fontsize=fontsize * 0.6, color='dimgray')
+        else:
+            ax.bar(x_positions, values, width=widths, color=colors, edgecolor='black', align='edge')
+            labelled = np.arange(len(values))
+
+        for i in labelled:
+            ax.text(centers[i], values[i] + 1, str(round(values[i], 2)), ha='center', rotation=90, fontsize=fontsize)
+
+        ax.set_xticks(centers[labelled])
+        ax.set_xticklabels([categories[i] for i in labelled], ha="center", rotation=90, fontsize=fontsize)
+        ax.set_title(f"Marginal Abatement Cost Curve (MACC) - {project_name}", fontsize=self.title_fontsize)
+        ax.set_xlabel("CO2 Abatement, Million Tonne", fontsize=fontsize)
+        ax.set_ylabel("MACC Values USD/Ton CO2", fontsize=fontsize)
+
+        for i in labelled:
+            ax.text(centers[i], -1.5, f"{int(widths[i])}", ha="center", fontsize=fontsize)
+
+        if line_value is not None:
+            ax.axhline(y=line_value, color='red', linestyle='--', linewidth=2)
+            ax.text(x_positions[0] - 0.2, line_value + 1,
+                    f"Internal carbon price {line_value}", color='black', fontsize=fontsize, ha='left')
+
+        ax.tick_params(axis='y', labelsize=fontsize)
+
+        ax.text(centers[-1], -10, f"Total: {total_abatement:.1f}",
+                ha='center', fontsize=fontsize, color="black")
+
+    # Large curves: one PolyCollection instead of a Rectangle artist per bar
+    def draw_bar_collection(self, ax, x_positions, values, widths, colors):
+        verts = np.empty((len(values), 4, 2))
+        verts[:, 0, 0] = verts[:, 1, 0] = x_positions
+        verts[:, 2, 0] = verts[:, 3, 0] = x_positions + widths
+        verts[:, 0, 1] = verts[:, 3, 1] = 0.0
+        verts[:, 1, 1] = verts[:, 2, 1] = values
+        # Edges would paint thin bars solid black, so they fade out with density
+        linewidth = 0.0 if len(values) > 2000 else 0.3
+        collection = PolyCollection(verts, facecolors=colors, edgecolors='black', linewidths=linewidth)
+        ax.add_collection(collection, autolim=True)
+        ax.autoscale_view()
+
+    # Picks the widest bars whose labels fit along the x axis without overlap
+    def legible_labels(self, ax, centers, widths):
+        axis_points = self.figsize[0] * ax.get_position().width * 72
+        max_labels = max(1, int(axis_points / (self.fontsize * 1.5)))
+        min_gap = widths.sum() * self.fontsize * 1.5 / axis_points
+
+        candidates = np.argsort(widths, kind='stable')[::-1][:max_labels * 4]
+        accepted = []
+        for i in candidates:
+            if len(accepted) >= max_labels:
+                break
+            if all(abs(centers[i] - centers[j]) >= min_gap for j in accepted):
+                accepted.append(i)
+        return np.sort(np.array(accepted, dtype=int))
+
+    # Carbon-price sensitivity: abatement and cost achievable at each price
+    def render_sweep(self, project_name, values, widths, prices, fmt='png'):
+        fontsize = self.fontsize
+        sweep = price_sweep(values, widths, prices)
+
+        fig = self.new_figure()
+        ax = fig.add_subplot()
+        ax.step(sweep["prices"], sweep["abatement"], where='post', color='tab:blue', linewidth=2)
+        ax.set_title(f"Carbon Price Sensitivity - {project_name}", fontsize=self.title_fontsize)
+        ax.set_xlabel("Carbon price USD/Ton CO2", fontsize=fontsize)
+        ax.set_ylabel("Achievable abatement, Million Tonne", fontsize=fontsize, color='tab:blue')
+        ax.tick_params(labelsize=fontsize)
+        ax.grid(True, alpha=0.3)
+
+        cost_ax = ax.twinx()
+        cost_ax.step(sweep["prices"], sweep["cost"], where='post', color='tab:red', linestyle='--', linewidth=2)
+        cost_ax.set_ylabel("Cumulative cost, Million USD", fontsize=fontsize, color='tab:red')
+        cost_ax.tick_params(labelsize=fontsize)
+
+        fig.subplots_adjust(left=0.12, right=0.88, bottom=0.1)
+        return self.encode(fig, fmt)
+
+    # Small multiples, one panel per year, laid out inside a single Axes: the
+    # panels share one scale, so tick positions are computed once, and every
+    # year's bars are offset copies from one vectorized pass over the
+    # (intervention x year) curve, drawn as one PolyCollection. This avoids
+    # the per-Axes tick and title layout that dominates a subplot grid.
+    trajectory_legend_limit = 20
+
+    def render_trajectory(self, project_name, categories, start_year, values, widths, line_value=None, fmt='png'):
+        fontsize = self.fontsize
+        curve = macc_trajectory(values, widths)
+        interventions, years = curve["values"].shape
+        columns = math.ceil(math.sqrt(years))
+        rows = math.ceil(years / columns)
+
+        low, high = trajectory_limits(curve["values"], line_value)
+        panel_width = max(float(curve["cumulative_abatement"][-1].max()), 1e-9)
+        step_x = panel_width * 1.15
+        step_y = (high - low) * 1.3
+        panel = np.arange(years)
+        offset_x = (panel % columns) * step_x
+        offset_y = -(panel // columns) * step_y
+
+        verts = np.empty((years, interventions, 4, 2))
+        left = curve["x"].T + offset_x[:, None]
+        right = left + curve["widths"].T
+        verts[..., 0, 0] = verts[..., 1, 0] = left
+        verts[..., 2, 0] = verts[..., 3, 0] = right
+        verts[..., 0, 1] = verts[..., 3, 1] = offset_y[:, None]
+        verts[..., 1, 1] = verts[..., 2, 1] = curve["values"].T + offset_y[:, None]
+        # Colors follow the intervention, not its merit-order position that year
+        facecolors = to_rgba_array(chart_colors(categories))[curve["order"].T]
+        linewidth = 0.3 if interventions <= self.large_n_threshold else 0.0
+
+        fig = self.new_figure()
+        ax = fig.add_subplot()
+        ax.set_axis_off()
+        ax.add_collection(PolyCollection(verts.reshape(-1, 4, 2), facecolors=facecolors.reshape(-1, 4),
+                                         edgecolors='black', linewidths=linewidth))
+
+        frames = np.empty((years, 4, 2))
+        frames[:, 0, 0] = frames[:, 1, 0] = offset_x
+        frames[:, 2, 0] = frames[:, 3, 0] = offset_x + panel_width
+        frames[:, 0, 1] = frames[:, 3, 1] = offset_y + low
+        frames[:, 1, 1] = frames[:, 2, 1] = offset_y + high
+        ax.add_collection(PolyCollection(frames, facecolors='none', edgecolors='dimgray', linewidths=0.8))
+
+        def panel_lines(y):
+            return np.stack([np.column_stack([offset_x, offset_y + y]),
+                             np.column_stack([offset_x + panel_width, offset_y + y])], axis=1)
+
+        ax.add_collection(LineCollection(panel_lines(0.0), colors='gray', linewidths=0.5))
+        if line_value is not None:
+            ax.add_collection(LineCollection(panel_lines(line_value), colors='red', linestyles='--', linewidths=1))
+
+        for year in range(years):
+            ax.text(offset_x[year] + panel_width / 2, offset_y[year] + high + (high - low) * 0.04,
+                    str(start_year + year), ha='center', va='bottom', fontsize=fontsize * 0.8)
+
+        # Tick labels only along the left column and the bottom panel of each column
+        tick_size = fontsize * 0.6
+        for value in MaxNLocator(4).tick_values(low, high):
+            if low <= value <= high:
+                for row in range(rows):
+                    ax.text(-panel_width * 0.03, -row * step_y + value, f"{value:g}",
+                            ha='right', va='center', fontsize=tick_size)
+        for column in range(min(columns, years)):
+            bottom_panel = column + columns * ((years - 1 - column) // columns)
+            for value in MaxNLocator(4).tick_values(0, panel_width):
+                if 0 <= value <= panel_width:
+                    ax.text(offset_x[bottom_panel] + value, offset_y[bottom_panel] + low - (high - low) * 0.04,
+                            f"{value:g}", ha='center', va='top', fontsize=tick_size)
+
+        ax.set_xlim(-panel_width * 0.02, (columns - 1) * step_x + panel_width * 1.02)
+        ax.set_ylim(-(rows - 1) * step_y + low - (high - low) * 0.2, high + (high - low) * 0.2)
+
+        fig.suptitle(f"MACC Trajectory - {project_name}", fontsize=self.title_fontsize)
+        fig.supylabel("MACC Values USD/Ton CO2", fontsize=fontsize)
+        bottom = 0.04
+        if interventions <= self.trajectory_legend_limit:
+            handles = [Patch(facecolor=color, edgecolor='black', label=category)
+                       for category, color in zip(categories, chart_colors(categories))]
+            fig.legend(handles=handles, loc='lower center', ncol=min(interventions, 5), fontsize=fontsize * 0.7,
+                       frameon=False)
+            bottom += 0.02 * math.ceil(interventions / 5)
+        fig.supxlabel("CO2 Abatement, Million Tonne", fontsize=fontsize, y=bottom)
+        fig.subplots_adjust(left=0.1, right=0.97, top=0.93, bottom=bottom + 0.03)
+        return self.encode(fig, fmt)
+
+    def encode(self, fig, fmt='png'):
+        fig.canvas.draw()
+        return encode_image(np.asarray(fig.canvas.buffer_rgba()), fmt)
+
+
+# A MACC is mostly flat colors, so an 8-bit palette PNG is several times
+# smaller than the RGBA output of savefig. The palette is lossy: antialiased
+# edges carry a few hundred colors, and median cut moves some of them, about
+# 0.1-1% of pixels by up to ~70 per channel. CHART_PNG_QUANTIZE=0 keeps PNGs
+# exact.
+def encode_image(rgba, fmt='png'):
+    image = Image.fromarray(rgba, 'RGBA').convert('RGB')
+    buf = io.BytesIO()
+    if fmt == 'png':
+        if PNG_QUANTIZE:
+            image = image.quantize(colors=256, method=Image.Quantize.MEDIANCUT, dither=Image.Dither.NONE)
+        image.save(buf, 'PNG', compress_level=PNG_COMPRESS_LEVEL)
+    elif fmt == 'webp':
+        image.save(buf, 'WEBP', lossless=True, quality=80, method=4)
+    elif fmt == 'avif':
+        image.save(buf, 'AVIF', quality=80, speed=8)
+    else:
+        raise ValueError(f"Unsupported chart format: {fmt}")
+    return buf.getvalue()
@@ -0,0 +1,82 @@
+import threading
+import time
+
+from sqlalchemy import event, exc
+from sqlalchemy.pool import QueuePool
+
+
+# Process-wide counters for the engine's connection pool. They live outside
+# the pool because engine.dispose() replaces the pool object.
+class PoolMetrics:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+        self.timeouts = 0
+        self.overflow_opened = 0
+        self.connects = 0
+        self.invalidated = 0
+
+    def checked_out(self, wait, overflowed):
+        with self._lock:
+            self.checkouts += 1
+            self.total_wait += wait
+            self.max_wait = max(self.max_wait, wait)
+            if overflowed:
+                self.overflow_opened += 1
+
+    def timed_out(self):
+        with self._lock:
+            self.timeouts += 1
+
+    def connected(self):
+        with self._lock:
+            self.connects += 1
+
+    def invalidate(self):
+        with self._lock:
+            self.invalidated += 1
+
+    def stats(self, pool):
+        with self._lock:
+            checkouts = self.checkouts or 1
+            return {
+                "size": pool.size(),
+                "in_use": pool.checkedout(),
+                "idle": pool.checkedin(),
+                "overflow": max(0, pool.overflow()),
+                "checkouts": self.checkouts,
+                "avg_wait_ms": round(self.total_wait / checkouts * 1000, 2),
+                "max_wait_ms": round(self.max_wait * 1000, 2),
+                "timeouts": self.timeouts,
+                "overflow_opened": self.overflow_opened,
+                "connects": self.connects,
+                "invalidated": self.invalidated,
+            }
+
+
+pool_metrics = PoolMetrics()
+
+
+# QueuePool that times how long each checkout waits for a connection and
+# notes when one had to be opened beyond pool_size
+class InstrumentedQueuePool(QueuePool):
+    def _do_get(self):
+        started = time.perf_counter()
+        overflow = self.overflow()
+        try:
+            connection = super()._do_get()
+        except exc.TimeoutError:
+            pool_metrics.timed_out()
+            raise
+        opened = self.overflow()
+        pool_metrics.checked_out(time.perf_counter() - started, opened > overflow and opened > 0)
+        return connection
+
+
+# Listeners registered on the engine carry over to the pools that
+# engine.dispose() creates, so this runs once per engine
+def instrument_engine(engine):
+    event.listen(engine, 'connect', lambda dbapi_connection, record: pool_metrics.connected())
+    event.listen(engine, 'invalidate', lambda dbapi_connection, record, exception: pool_metrics.invalidate())
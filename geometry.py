@@ -0,0 +1,22 @@
+from analytics import macc_curve, macc_summary
+from chart_cache import chart_colors
+
+
+# Bar geometry of a MACC in data coordinates, laid out column-wise so the
+# JSON stays compact. This is everything a client needs to draw the chart.
+def macc_geometry(spec):
+    curve = macc_curve(spec["values"], spec["widths"], sort=False)
+    summary = macc_summary(curve, spec["line_value"])
+    return {
+        "project_name": spec["project_name"],
+        "line_value": spec["line_value"],
+        "total_abatement": summary["total_abatement"],
+        "summary": summary,
+        "bars": {
+            "label": spec["categories"],
+            "x": curve["x"].tolist(),
+            "width": spec["widths"],
+            "height": spec["values"],
+            "color": chart_colors(spec["categories"]),
+        },
+    }
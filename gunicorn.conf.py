@@ -0,0 +1,28 @@
+# gunicorn settings: gunicorn -c gunicorn.conf.py app:app
+#
+# The app is imported once in the master (preload_app) and warmed up there,
+# then the heap is frozen so forked workers keep sharing those pages instead
+# of copying them the first time the garbage collector touches them.
+import gc
+import os
+
+bind = f"0.0.0.0:{os.environ.get('PORT', '5000')}"
+workers = int(os.environ.get('WEB_CONCURRENCY', 2))
+worker_class = 'gthread'
+threads = int(os.environ.get('GUNICORN_THREADS', 4))
+timeout = int(os.environ.get('GUNICORN_TIMEOUT', 120))
+preload_app = True
+
+
+def when_ready(server):
+    from app import warm_up
+    warm_up()
+
+
+def pre_fork(server, worker):
+    gc.freeze()
+
+
+def post_fork(server, worker):
+    from app import warm_up_worker
+    warm_up_worker()
@@ -0,0 +1,132 @@
+import logging
+import threading
+import time
+from collections import OrderedDict, namedtuple
+
+# The parts of a user that gate every request. Snapshots are immutable, so one
+# cached entry can be shared by concurrent requests.
+Identity = namedtuple('Identity', ['id', 'email', 'approved', 'quota', 'last_login'])
+
+
+# Per-process LRU of identities that expire after ttl seconds. Changes made in
+# this process are applied with update() or invalidate(); changes made by other
+# worker processes become visible once the entry expires.
+class IdentityCache:
+    def __init__(self, ttl, max_entries):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, email):
+        with self._lock:
+            entry = self._entries.get(email)
+            if entry is not None and entry[0] > time.monotonic():
+                self._entries.move_to_end(email)
+                self.hits += 1
+                return entry[1]
+            if entry is not None:
+                del self._entries[email]
+            self.misses += 1
+            return None
+
+    def put(self, identity):
+        if self.ttl <= 0:
+            return
+        with self._lock:
+            self._entries.pop(identity.email, None)
+            self._entries[identity.email] = (time.monotonic() + self.ttl, identity)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    # Replaces fields of a cached identity without extending its lifetime
+    def update(self, email, **changes):
+        with self._lock:
+            entry = self._entries.get(email)
+            if entry is not None:
+                self._entries[email] = (entry[0], entry[1]._replace(**changes))
+
+    def invalidate(self, email):
+        with self._lock:
+            if self._entries.pop(email, None) is not None:
+                self.invalidations += 1
+
+    def stats(self):
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "ttl": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "invalidations": self.invalidations,
+            }
+
+
+# Write-behind buffer for last-login timestamps. Logins record into memory and
+# a timer hands everything recorded in the last interval seconds to flush() as
+# one {user_id: timestamp} batch; a full buffer is flushed right away.
+class LastLoginBuffer:
+    def __init__(self, flush, interval, max_pending):
+        self._flush = flush
+        self.interval = interval
+        self.max_pending = max_pending
+        self.flushes = 0
+        self.flushed = 0
+        self.failed = 0
+        self._pending = {}
+        self._timer = None
+        self._lock = threading.Lock()
+
+    def record(self, user_id, when):
+        with self._lock:
+            self._pending[user_id] = when
+            full = len(self._pending) >= self.max_pending
+            if not full:
+                self._schedule()
+        if full:
+            self.flush()
+
+    def _schedule(self):
+        if self._timer is None:
+            self._timer = threading.Timer(self.interval, self.flush)
+            self._timer.daemon = True
+            self._timer.start()
+
+    def pending(self, user_id):
+        with self._lock:
+            return self._pending.get(user_id)
+
+    def flush(self):
+        with self._lock:
+            batch, self._pending = self._pending, {}
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+        if not batch:
+            return
+        try:
+            self._flush(batch)
+        except Exception as e:
+            logging.error(f"Failed to flush {len(batch)} last-login updates: {e}")
+            with self._lock:
+                self.failed += len(batch)
+                # Keep anything newer that was recorded while flushing
+                for user_id, when in batch.items():
+                    self._pending.setdefault(user_id, when)
+                self._schedule()
+            return
+        with self._lock:
+            self.flushes += 1
+            self.flushed += len(batch)
+
+    def stats(self):
+        with self._lock:
+            return {
+                "pending": len(self._pending),
+                "flushes": self.flushes,
+                "flushed": self.flushed,
+                "failed": self.failed,
+            }
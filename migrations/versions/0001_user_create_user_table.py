@@ -0,0 +1,42 @@
+"""Create user table
+
+Databases created before migrations were added already have this table from
+db.create_all(); the upgrade leaves it alone so they can run `flask db upgrade`
+directly.
+
+Revision ID: 0001_user
+Revises: 
+Create Date: 2026-10-18 03:05:04.250606
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0001_user'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    if sa.inspect(op.get_bind()).has_table('user'):
+        return
+    op.create_table('user',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('email', sa.String(length=120), nullable=False),
+    sa.Column('password', sa.String(length=120), nullable=False),
+    sa.Column('quota', sa.Integer(), nullable=True),
+    sa.Column('approved', sa.Boolean(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('last_login', sa.DateTime(), nullable=True),
+    sa.Column('remember_token', sa.String(length=100), nullable=True),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('email'),
+    sa.UniqueConstraint('remember_token')
+    )
+
+
+def downgrade():
+    op.drop_table('user')
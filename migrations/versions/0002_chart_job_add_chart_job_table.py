@@ -0,0 +1,41 @@
+"""Add chart_job table
+
+Revision ID: 0002_chart_job
+Revises: 0001_user
+Create Date: 2026-10-18 03:05:12.371936
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0002_chart_job'
+down_revision = '0001_user'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('chart_job',
+    sa.Column('id', sa.String(length=32), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('status', sa.String(length=16), nullable=False),
+    sa.Column('spec', sa.Text(), nullable=False),
+    sa.Column('digest', sa.String(length=64), nullable=True),
+    sa.Column('error', sa.String(length=500), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('started_at', sa.DateTime(), nullable=True),
+    sa.Column('finished_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['user_id'], ['user.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('chart_job', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_chart_job_user_id'), ['user_id'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('chart_job', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_chart_job_user_id'))
+
+    op.drop_table('chart_job')
@@ -0,0 +1,69 @@
+import concurrent.futures
+
+import bcrypt
+
+from bounded_executor import BoundedExecutor, ExecutorBusy
+
+
+class HasherBusy(ExecutorBusy):
+    pass
+
+
+def _check(password, hashed):
+    try:
+        return bcrypt.checkpw(password, hashed)
+    except ValueError:
+        # Malformed stored hash
+        return False
+
+
+# Dedicated thread pool for bcrypt. bcrypt releases the GIL while it works,
+# so the pool size caps how many cores a burst of logins or registrations
+# can take from chart rendering. Operations beyond the admitted ones, or that
+# wait longer than timeout, raise HasherBusy.
+class PasswordHasher(BoundedExecutor):
+    busy_error = HasherBusy
+    busy_message = "Password hashing busy ({capacity} operations admitted)"
+
+    def __init__(self, rounds=12, workers=2, queue_size=16, timeout=10):
+        super().__init__(max(workers, 1), queue_size, timeout)
+        self.rounds = rounds
+        self.rehashed = 0
+        self.timeouts = 0
+
+    def _create_executor(self):
+        return concurrent.futures.ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='bcrypt')
+
+    def _run(self, kind, fn, *args):
+        future = self.submit(fn, *args, tag=kind)
+        try:
+            return future.result(timeout=self.timeout)
+        except concurrent.futures.TimeoutError:
+            # The pool is backed up; callers answer this like a full queue
+            with self._lock:
+                self.timeouts += 1
+            raise HasherBusy(f"Password hashing did not finish within {self.timeout}s")
+
+    def hash(self, password):
+        hashed = self._run("hash", bcrypt.hashpw, password.encode('utf-8'), bcrypt.gensalt(self.rounds))
+        return hashed.decode('utf-8')
+
+    def check(self, password, hashed):
+        return self._run("check", _check, password.encode('utf-8'), hashed.encode('utf-8'))
+
+    # True when a stored hash was made with a different cost than configured
+    def needs_rehash(self, hashed):
+        try:
+            return int(hashed.split('$')[2]) != self.rounds
+        except (IndexError, ValueError):
+            return False
+
+    def record_rehash(self):
+        with self._lock:
+            self.rehashed += 1
+
+    def stats(self):
+        stats = super().stats()
+        with self._lock:
+            stats.update(rounds=self.rounds, rehashed=self.rehashed, timeouts=self.timeouts)
+        return stats
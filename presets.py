@@ -0,0 +1,44 @@
+import functools
+import os
+
+# Named output sizes. Font sizes scale with the figure so every preset keeps
+# the proportions of the original 20x25 inch print layout.
+PRESETS = {
+    "thumbnail": {"figsize": (6, 7.5), "dpi": 67, "fontsize": 7, "title_fontsize": 9},
+    "screen": {"figsize": (10, 12.5), "dpi": 100, "fontsize": 10, "title_fontsize": 12},
+    "print": {"figsize": (20, 25), "dpi": 100, "fontsize": 20, "title_fontsize": 24},
+}
+DEFAULT_PRESET = "print"
+
+
+def preset_width(preset):
+    options = PRESETS[preset]
+    return int(options["figsize"][0] * options["dpi"])
+
+
+# Output encodings. CHART_FORMATS sets the preference order; clients get the
+# first enabled one they list in Accept, anything else falls back to PNG.
+FORMATS = {
+    "webp": "image/webp",
+    "avif": "image/avif",
+    "png": "image/png",
+}
+DEFAULT_FORMAT = "png"
+PNG_COMPRESS_LEVEL = int(os.environ.get('CHART_PNG_COMPRESS_LEVEL', 9))
+PNG_QUANTIZE = os.environ.get('CHART_PNG_QUANTIZE', '1') == '1'
+
+
+@functools.lru_cache(maxsize=None)
+def enabled_formats():
+    from PIL import features
+    wanted = os.environ.get('CHART_FORMATS', ','.join(FORMATS)).split(',')
+    return [fmt for fmt in wanted
+            if fmt in FORMATS and (fmt == DEFAULT_FORMAT or features.check(fmt))] or [DEFAULT_FORMAT]
+
+
+def negotiate_format(accept_mimetypes):
+    listed = {mimetype for mimetype, quality in accept_mimetypes if quality > 0}
+    for fmt in enabled_formats():
+        if FORMATS[fmt] in listed:
+            return fmt
+    return DEFAULT_FORMAT
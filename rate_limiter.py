@@ -0,0 +1,48 @@
+import threading
+import time
+from collections import OrderedDict
+
+
+# Per-process token buckets keyed by user. Each key may spend up to burst
+# requests at once and earns rate_per_minute back over a minute; acquire()
+# returns 0 when the request may go ahead, else the seconds until it could.
+# A rate of 0 disables the limit. Like the identity cache the buckets live in
+# each worker, so a user spread across workers gets that many allowances.
+class RateLimiter:
+    def __init__(self, rate_per_minute, burst, max_entries=10000):
+        self.rate = rate_per_minute / 60.0
+        self.burst = max(burst, 1)
+        self.max_entries = max_entries
+        self.allowed = 0
+        self.rejected = 0
+        self._buckets = OrderedDict()
+        self._lock = threading.Lock()
+
+    def acquire(self, key):
+        if self.rate <= 0:
+            return 0.0
+        now = time.monotonic()
+        with self._lock:
+            tokens, updated = self._buckets.pop(key, (self.burst, now))
+            tokens = min(self.burst, tokens + (now - updated) * self.rate)
+            if tokens >= 1:
+                tokens -= 1
+                wait = 0.0
+                self.allowed += 1
+            else:
+                wait = (1 - tokens) / self.rate
+                self.rejected += 1
+            self._buckets[key] = (tokens, now)
+            while len(self._buckets) > self.max_entries:
+                self._buckets.popitem(last=False)
+            return wait
+
+    def stats(self):
+        with self._lock:
+            return {
+                "entries": len(self._buckets),
+                "rate_per_minute": self.rate * 60,
+                "burst": self.burst,
+                "allowed": self.allowed,
+                "rejected": self.rejected,
+            }
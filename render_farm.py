@@ -0,0 +1,57 @@
+import concurrent.futures
+from concurrent.futures.process import BrokenProcessPool
+import logging
+import multiprocessing
+
+from bounded_executor import BoundedExecutor, ExecutorBusy
+
+
+class RenderQueueFull(ExecutorBusy):
+    pass
+
+
+# Per-process renderers by preset, created on first use inside the pool worker
+_renderers = {}
+
+
+def render_chart(spec, preset='print', fmt='png'):
+    renderer = _renderers.get(preset)
+    if renderer is None:
+        from charting import MaccRenderer
+        renderer = _renderers[preset] = MaccRenderer.for_preset(preset)
+    return renderer.render_spec(spec, fmt)
+
+
+# Fixed-size local process pool for chart rendering; see BoundedExecutor for
+# admission. Pool processes fork from a forkserver that already imported
+# matplotlib.
+class RenderFarm(BoundedExecutor):
+    busy_error = RenderQueueFull
+    busy_message = "Render queue full ({capacity} jobs admitted)"
+
+    def __init__(self, workers, queue_size, timeout, start_method='forkserver'):
+        super().__init__(workers, queue_size, timeout)
+        self.start_method = start_method
+
+    def _create_executor(self):
+        context = multiprocessing.get_context(self.start_method)
+        if self.start_method == 'forkserver':
+            context.set_forkserver_preload(['render_farm', 'charting'])
+        return concurrent.futures.ProcessPoolExecutor(max_workers=self.workers, mp_context=context)
+
+    def _job_failed(self, error):
+        if isinstance(error, BrokenProcessPool):
+            logging.error(f"Render pool broken, recreating on next submit: {error}")
+            with self._lock:
+                self._executor = None
+
+    def render(self, spec, preset='print', fmt='png', block=False):
+        future = self.submit(render_chart, spec, preset, fmt, block=block, tag=f"{preset}.{fmt}")
+        return future.result(timeout=self.timeout)
+
+    # Starts every pool process and has each render a throwaway chart, so font
+    # loading and the first Agg draw are not paid by a user's request
+    def warm_up(self, spec, preset='print', fmt='png'):
+        futures = [self.submit(render_chart, spec, preset, fmt, block=True) for _ in range(max(self.workers, 1))]
+        for future in futures:
+            future.result(timeout=self.timeout)
@@ -0,0 +1,41 @@
+# Render-time budget check for large MACCs.
+#
+#   python scripts/bench_render.py [N ...]
+#
+# Exits non-zero when any render exceeds RENDER_BUDGET_SECONDS.
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+import numpy as np
+
+from charting import MaccRenderer
+
+RENDER_BUDGET_SECONDS = float(os.environ.get('RENDER_BUDGET_SECONDS', 2.0))
+
+
+def main():
+    sizes = [int(n) for n in sys.argv[1:]] or [10, 1000, 10000]
+    rng = np.random.default_rng(0)
+    renderer = MaccRenderer()
+    # First render pays for font cache loading, which is not what we measure
+    renderer.render("warm-up", ["a"], [1.0], [1.0])
+
+    failed = False
+    for n in sizes:
+        categories = [f"Intervention {i}" for i in range(n)]
+        values = np.sort(rng.normal(20, 40, n)).round(1).tolist()
+        widths = rng.uniform(0.1, 5, n).round(2).tolist()
+        start = time.perf_counter()
+        png = renderer.render("Benchmark", categories, values, widths, 25.0)
+        elapsed = time.perf_counter() - start
+        status = "ok" if elapsed <= RENDER_BUDGET_SECONDS else "OVER BUDGET"
+        failed = failed or elapsed > RENDER_BUDGET_SECONDS
+        print(f"N={n:>6}  {elapsed * 1000:8.1f} ms  {len(png) / 1024:8.1f} KiB  {status}")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,45 @@
+# Per-request template overhead, before and after the template registry.
+#
+#   DATABASE_URL=... python scripts/bench_templates.py [iterations]
+#
+# Compares compiling the source string on every call (render_template_string,
+# what the routes used to do) with rendering the registered, precompiled
+# template, and with serving a cached static page. Importing app.py runs the
+# admin bootstrap query, so DATABASE_URL must point at a database that has
+# the tables.
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from flask import render_template, render_template_string
+
+import app as web
+
+
+def per_call_us(fn, iterations):
+    fn()
+    start = time.perf_counter()
+    for _ in range(iterations):
+        fn()
+    return (time.perf_counter() - start) / iterations * 1e6
+
+
+def main():
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    page = {"chart": None, "chart_sizes": web.CHART_SIZES, "last_login": None}
+    cases = [
+        ("index, from string", lambda: render_template_string(web.HTML_TEMPLATE, **page)),
+        ("index, registered", lambda: render_template("index.html", **page)),
+        ("login, from string", lambda: render_template_string(web.AUTH_TEMPLATE, title="Login", message="")),
+        ("login, registered", lambda: render_template("auth.html", title="Login", message="")),
+        ("login, static bytes", lambda: web.static_page("auth.html", title="Login", message="")),
+    ]
+    with web.app.test_request_context('/'):
+        for label, fn in cases:
+            print(f"{label:<22} {per_call_us(fn, iterations):10.1f} us/request")
+
+
+if __name__ == "__main__":
+    main()
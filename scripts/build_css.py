@@ -0,0 +1,212 @@
+# Builds the self-hosted stylesheet that replaces the Tailwind Play CDN.
+#
+#   python scripts/build_css.py
+#
+# Collects every class the templates use, generates just those utilities
+# (Tailwind v3 naming and values) after static/src/base.css, and writes
+# static/css/app.<hash>.css with .gz and, when the brotli package is
+# installed, .br variants next to it. static/manifest.json maps the logical
+# name to the hashed file for the app's asset_url(). Fails on any class it
+# does not know, so new template classes are noticed at build time. Run it
+# after changing template classes and commit the output.
+import gzip
+import hashlib
+import json
+import os
+import re
+import sys
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+SOURCES = ['app.py']
+BASE_CSS = os.path.join(ROOT, 'static', 'src', 'base.css')
+OUTPUT_DIR = os.path.join(ROOT, 'static', 'css')
+MANIFEST = os.path.join(ROOT, 'static', 'manifest.json')
+
+SPACING = {'0': '0px', '1': '0.25rem', '2': '0.5rem', '3': '0.75rem', '4': '1rem', '6': '1.5rem', '8': '2rem',
+           '12': '3rem'}
+COLORS = {
+    'white': '#ffffff',
+    'gray-50': '#f9fafb', 'gray-100': '#f3f4f6', 'gray-300': '#d1d5db', 'gray-600': '#4b5563',
+    'gray-700': '#374151', 'gray-800': '#1f2937',
+    'red-500': '#ef4444', 'red-600': '#dc2626',
+    'yellow-500': '#eab308', 'yellow-600': '#ca8a04', 'yellow-700': '#a16207',
+    'green-500': '#22c55e', 'green-600': '#16a34a', 'green-700': '#15803d',
+    'teal-500': '#14b8a6', 'teal-600': '#0d9488', 'teal-700': '#0f766e',
+    'blue-500': '#3b82f6', 'blue-600': '#2563eb', 'blue-700': '#1d4ed8',
+    'indigo-500': '#6366f1', 'indigo-600': '#4f46e5', 'indigo-700': '#4338ca',
+    'purple-500': '#a855f7', 'purple-600': '#9333ea', 'purple-700': '#7e22ce',
+}
+FONT_SIZES = {'xs': ('0.75rem', '1rem'), 'sm': ('0.875rem', '1.25rem'), 'lg': ('1.125rem', '1.75rem'),
+              'xl': ('1.25rem', '1.75rem'), '2xl': ('1.5rem', '2rem')}
+SHADOWS = {
+    'shadow-sm': '0 1px 2px 0 rgb(0 0 0 / 0.05)',
+    'shadow-md': '0 4px 6px -1px rgb(0 0 0 / 0.1), 0 2px 4px -2px rgb(0 0 0 / 0.1)',
+    'shadow-lg': '0 10px 15px -3px rgb(0 0 0 / 0.1), 0 4px 6px -4px rgb(0 0 0 / 0.1)',
+    'shadow-inner': 'inset 0 2px 4px 0 rgb(0 0 0 / 0.05)',
+}
+STATIC = {
+    'block': 'display: block', 'inline-flex': 'display: inline-flex', 'flex': 'display: flex',
+    'grid': 'display: grid', 'hidden': 'display: none', 'relative': 'position: relative',
+    'flex-col': 'flex-direction: column', 'flex-row': 'flex-direction: row', 'flex-grow': 'flex-grow: 1',
+    'items-center': 'align-items: center', 'justify-center': 'justify-content: center',
+    'justify-between': 'justify-content: space-between',
+    'w-full': 'width: 100%', 'w-auto': 'width: auto', 'h-auto': 'height: auto', 'min-w-full': 'min-width: 100%',
+    'min-h-screen': 'min-height: 100vh', 'max-w-md': 'max-width: 28rem', 'max-w-2xl': 'max-width: 42rem',
+    'mx-auto': 'margin-left: auto; margin-right: auto', 'overflow-x-auto': 'overflow-x: auto',
+    'text-left': 'text-align: left', 'text-center': 'text-align: center',
+    'font-medium': 'font-weight: 500', 'font-semibold': 'font-weight: 600', 'font-bold': 'font-weight: 700',
+    'tracking-tight': 'letter-spacing: -0.025em', 'underline': 'text-decoration-line: underline',
+    'rounded-md': 'border-radius: 0.375rem', 'rounded-lg': 'border-radius: 0.5rem',
+    'rounded-xl': 'border-radius: 0.75rem', 'border-t': 'border-top-width: 1px',
+    'outline-none': 'outline: 2px solid transparent; outline-offset: 2px',
+    'transition': 'transition-property: color, background-color, border-color, text-decoration-color, fill, '
+                  'stroke, opacity, box-shadow, transform, filter, backdrop-filter; '
+                  'transition-timing-function: cubic-bezier(0.4, 0, 0.2, 1); transition-duration: 150ms',
+    'duration-300': 'transition-duration: 300ms',
+    'bg-gradient-to-r': 'background-image: linear-gradient(to right, var(--tw-gradient-stops))',
+    'ring-2': 'box-shadow: 0 0 0 var(--tw-ring-offset-width, 0px) var(--tw-ring-offset-color, #fff), '
+              '0 0 0 calc(2px + var(--tw-ring-offset-width, 0px)) var(--tw-ring-color, rgb(59 130 246 / 0.5)), '
+              'var(--tw-shadow, 0 0 #0000)',
+    'ring-offset-2': '--tw-ring-offset-width: 2px',
+}
+# Classes defined by base.css rather than generated
+COMPONENTS = {'card', 'fade-in', 'hover-scale', 'logout-button', 'username-display'}
+BREAKPOINTS = {'sm': '640px'}
+PSEUDO = {'hover', 'focus'}
+CONTAINER_WIDTHS = ['640px', '768px', '1024px', '1280px', '1536px']
+
+CLASS_ATTRIBUTE = re.compile(r'class="([^"{}]*)"')
+CLASS_LIST_CALL = re.compile(r"classList\.(?:add|remove|toggle)\('([^']+)'\)")
+
+
+def used_classes():
+    classes = set()
+    for source in SOURCES:
+        with open(os.path.join(ROOT, source), encoding='utf-8') as f:
+            text = f.read()
+        for match in CLASS_ATTRIBUTE.finditer(text):
+            classes.update(match.group(1).split())
+        classes.update(CLASS_LIST_CALL.findall(text))
+    return classes
+
+
+# Declarations for one utility without its variant prefixes, or None
+def declarations(utility):
+    if utility in STATIC:
+        return STATIC[utility]
+    if utility in SHADOWS:
+        return (f"--tw-shadow: {SHADOWS[utility]}; box-shadow: var(--tw-ring-offset-shadow, 0 0 #0000), "
+                f"var(--tw-ring-shadow, 0 0 #0000), var(--tw-shadow)")
+    match = re.fullmatch(r'(p|px|py|m|mt|mb|mr|gap|space-y)-(\w+)', utility)
+    if match and match.group(2) in SPACING:
+        size = SPACING[match.group(2)]
+        return {
+            'p': f'padding: {size}', 'px': f'padding-left: {size}; padding-right: {size}',
+            'py': f'padding-top: {size}; padding-bottom: {size}', 'm': f'margin: {size}',
+            'mt': f'margin-top: {size}', 'mb': f'margin-bottom: {size}', 'mr': f'margin-right: {size}',
+            'gap': f'gap: {size}', 'space-y': f'margin-top: {size}',
+        }[match.group(1)]
+    match = re.fullmatch(r'grid-cols-(\d+)', utility)
+    if match:
+        return f'grid-template-columns: repeat({match.group(1)}, minmax(0, 1fr))'
+    match = re.fullmatch(r'text-(\w+)', utility)
+    if match and match.group(1) in FONT_SIZES:
+        size, line_height = FONT_SIZES[match.group(1)]
+        return f'font-size: {size}; line-height: {line_height}'
+    match = re.fullmatch(r'(bg|text|border|ring|from|to)-([a-z]+(?:-\d+)?)', utility)
+    if match and match.group(2) in COLORS:
+        color = COLORS[match.group(2)]
+        return {
+            'bg': f'background-color: {color}', 'text': f'color: {color}', 'border': f'border-color: {color}',
+            'ring': f'--tw-ring-color: {color}',
+            'from': f'--tw-gradient-from: {color}; --tw-gradient-to: {color}00; '
+                    f'--tw-gradient-stops: var(--tw-gradient-from), var(--tw-gradient-to)',
+            'to': f'--tw-gradient-to: {color}',
+        }[match.group(1)]
+    return None
+
+
+def escape(name):
+    return re.sub(r'([:.\[\]/])', r'\\\1', name)
+
+
+# Shorthands are emitted before the longhands that refine them (p-3 before
+# px-4, transition before duration-300), as in Tailwind's own ordering
+LONGHAND_PREFIXES = ('px-', 'py-', 'mx-', 'mt-', 'mb-', 'mr-', 'duration-', 'ring-offset-', 'ring-', 'to-')
+
+
+def rule_order(name):
+    utility = name.split(':')[-1]
+    return (utility.startswith(LONGHAND_PREFIXES), name)
+
+
+# One rule per class; responsive rules are grouped per breakpoint at the end
+# so they win over the unprefixed utilities, as in Tailwind.
+def utility_css(classes):
+    rules = []
+    responsive = {width: [] for width in BREAKPOINTS.values()}
+    unknown = []
+    for name in sorted(classes - COMPONENTS, key=rule_order):
+        *variants, utility = name.split(':')
+        if utility == 'container' and not variants:
+            rules.append('.container { width: 100% }')
+            for width in CONTAINER_WIDTHS:
+                responsive.setdefault(width, []).append(f'.container {{ max-width: {width} }}')
+            continue
+        body = declarations(utility)
+        breakpoints = [variant for variant in variants if variant in BREAKPOINTS]
+        pseudo = [variant for variant in variants if variant in PSEUDO]
+        if body is None or len(breakpoints) + len(pseudo) != len(variants):
+            unknown.append(name)
+            continue
+        selector = '.' + escape(name) + ''.join(f':{state}' for state in pseudo)
+        if utility.startswith('space-y-'):
+            selector += ' > :not([hidden]) ~ :not([hidden])'
+        rule = f'{selector} {{ {body} }}'
+        (responsive[BREAKPOINTS[breakpoints[0]]] if breakpoints else rules).append(rule)
+
+    if unknown:
+        sys.exit(f"Unknown classes, add them to scripts/build_css.py: {' '.join(unknown)}")
+    css = rules[:]
+    for width, group in responsive.items():
+        if group:
+            css.append(f'@media (min-width: {width}) {{\n  ' + '\n  '.join(group) + '\n}')
+    return '\n'.join(css) + '\n'
+
+
+def write(path, data):
+    with open(path, 'wb') as f:
+        f.write(data)
+
+
+def main():
+    with open(BASE_CSS, encoding='utf-8') as f:
+        css = (f.read() + '\n/* Utilities */\n' + utility_css(used_classes())).encode('utf-8')
+    digest = hashlib.sha256(css).hexdigest()[:12]
+    name = f'app.{digest}.css'
+
+    os.makedirs(OUTPUT_DIR, exist_ok=True)
+    for stale in os.listdir(OUTPUT_DIR):
+        if stale.startswith('app.') and not stale.startswith(name):
+            os.remove(os.path.join(OUTPUT_DIR, stale))
+    path = os.path.join(OUTPUT_DIR, name)
+    write(path, css)
+    # mtime=0 keeps the gzip output byte-identical between builds
+    write(path + '.gz', gzip.compress(css, compresslevel=9, mtime=0))
+    try:
+        import brotli
+    except ImportError:
+        print("brotli not installed, skipping the .br variant")
+    else:
+        write(path + '.br', brotli.compress(css, quality=11))
+    with open(MANIFEST, 'w', encoding='utf-8') as f:
+        json.dump({'app.css': f'css/{name}'}, f, indent=2)
+        f.write('\n')
+
+    sizes = ', '.join(f"{ext or '.css'} {os.path.getsize(path + ext)} B"
+                      for ext in ('', '.gz', '.br') if os.path.exists(path + ext))
+    print(f"Wrote static/css/{name}: {sizes}")
+
+
+if __name__ == "__main__":
+    main()
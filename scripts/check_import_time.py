@@ -0,0 +1,71 @@
+# Cold-start import budget for the web layer.
+#
+#   DATABASE_URL=... python scripts/check_import_time.py
+#
+# Imports app.py in fresh interpreters under `python -X importtime` and exits
+# non-zero when the best run takes longer than IMPORT_BUDGET_SECONDS, or when
+# any module of the charting stack is loaded at import time. Importing app.py
+# also runs the admin bootstrap query, so DATABASE_URL must point at a
+# database that has the tables.
+import os
+import re
+import subprocess
+import sys
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+IMPORT_BUDGET_SECONDS = float(os.environ.get('IMPORT_BUDGET_SECONDS', 1.0))
+IMPORT_RUNS = int(os.environ.get('IMPORT_RUNS', 3))
+# Only chart rendering and the analytics routes may pull these in
+CHARTING_MODULES = ('matplotlib', 'numpy', 'PIL')
+
+IMPORT_LINE = re.compile(r'^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)$')
+
+
+# Returns the cumulative import time of app in microseconds, the same for
+# each module app imports directly, and the names of every module loaded
+def import_profile():
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', 'import app'],
+                            cwd=ROOT, capture_output=True, text=True)
+    if result.returncode != 0:
+        sys.exit(f"import app failed:\n{result.stderr[-2000:]}")
+
+    total = 0
+    direct = {}
+    modules = set()
+    # Each nesting level indents the module name by two more spaces
+    for line in result.stderr.splitlines():
+        match = IMPORT_LINE.match(line)
+        if not match:
+            continue
+        _, cumulative, indent, name = match.groups()
+        modules.add(name)
+        if len(indent) == 1 and name == 'app':
+            total = int(cumulative)
+        elif len(indent) == 3:
+            direct[name] = int(cumulative)
+    return total, direct, modules
+
+
+def main():
+    runs = [import_profile() for _ in range(IMPORT_RUNS)]
+    total, direct, modules = min(runs, key=lambda run: run[0])
+    total /= 1e6
+
+    print(f"Slowest imports of app.py, best of {IMPORT_RUNS} runs:")
+    for name, micros in sorted(direct.items(), key=lambda item: item[1], reverse=True)[:10]:
+        print(f"  {micros / 1000:8.1f} ms  {name}")
+    print(f"Total {total * 1000:.1f} ms, budget {IMPORT_BUDGET_SECONDS * 1000:.0f} ms")
+
+    failed = False
+    leaked = sorted(name for name in modules if name.split('.')[0] in CHARTING_MODULES and '.' not in name)
+    if leaked:
+        print(f"Charting stack imported at startup: {', '.join(leaked)}")
+        failed = True
+    if total > IMPORT_BUDGET_SECONDS:
+        print("OVER BUDGET")
+        failed = True
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
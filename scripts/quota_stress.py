@@ -0,0 +1,93 @@
+# Concurrency check for quota reservation.
+#
+#   DATABASE_URL=... python scripts/quota_stress.py
+#
+# Creates a throwaway account with QUOTA_STRESS_QUOTA units, then has
+# QUOTA_STRESS_THREADS threads race to reserve QUOTA_STRESS_ATTEMPTS units
+# each through reserve_quota(), refunding every QUOTA_STRESS_REFUND_EVERY-th
+# one as a failed render would. Exits non-zero if more than the quota was
+# granted or the stored balance disagrees with what was granted. Point DATABASE_URL at a
+# PostgreSQL database to exercise real row locking; SQLite serializes writers.
+import os
+import sys
+import threading
+import uuid
+from collections import Counter
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+os.environ.setdefault('BCRYPT_ROUNDS', '4')
+
+from app import app, db, User, Identity, reserve_quota, refund_quota  # noqa: E402
+
+QUOTA = int(os.environ.get('QUOTA_STRESS_QUOTA', 200))
+THREADS = int(os.environ.get('QUOTA_STRESS_THREADS', 32))
+ATTEMPTS = int(os.environ.get('QUOTA_STRESS_ATTEMPTS', 20))
+REFUND_EVERY = int(os.environ.get('QUOTA_STRESS_REFUND_EVERY', 7))
+
+
+def hammer(identity, start, counts, lock):
+    local = Counter()
+    start.wait()
+    with app.app_context():
+        for attempt in range(1, ATTEMPTS + 1):
+            try:
+                granted = reserve_quota(identity)
+            except Exception:
+                local["errors"] += 1
+                continue
+            if not granted:
+                local["denied"] += 1
+            elif attempt % REFUND_EVERY == 0:
+                refund_quota(identity)
+                local["refunded"] += 1
+            else:
+                local["granted"] += 1
+    with lock:
+        counts.update(local)
+
+
+def main():
+    email = f"quota-stress-{uuid.uuid4().hex[:8]}@example.com"
+    with app.app_context():
+        user = User(email=email, quota=QUOTA, approved=True)
+        user.set_password(uuid.uuid4().hex)
+        db.session.add(user)
+        db.session.commit()
+        identity = Identity(user.id, user.email, user.approved, user.quota, None)
+
+    counts = Counter()
+    lock = threading.Lock()
+    start = threading.Barrier(THREADS)
+    threads = [threading.Thread(target=hammer, args=(identity, start, counts, lock)) for _ in range(THREADS)]
+    try:
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        with app.app_context():
+            stored = db.session.get(User, identity.id).quota
+    finally:
+        with app.app_context():
+            User.query.filter_by(id=identity.id).delete()
+            db.session.commit()
+
+    requested = THREADS * ATTEMPTS
+    print(f"{requested} attempts from {THREADS} threads against quota {QUOTA}: "
+          f"{counts['granted']} granted, {counts['refunded']} refunded, "
+          f"{counts['denied']} denied, {counts['errors']} errors; stored quota {stored}")
+
+    failed = False
+    if counts["errors"]:
+        print("Reservations raised errors")
+        failed = True
+    if stored < 0 or stored != QUOTA - counts["granted"]:
+        print("Stored quota does not match the units granted")
+        failed = True
+    if counts["granted"] > QUOTA:
+        print("Granted more than the quota")
+        failed = True
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,33 @@
+import os
+import tempfile
+
+import pytest
+
+# The app reads its configuration at import time, so point it at a scratch
+# sqlite database and keep renders in-process before it is imported
+_scratch = tempfile.mkdtemp(prefix="macc-tests-")
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{os.path.join(_scratch, 'test.db')}")
+os.environ.setdefault("CHART_STORE_DIR", os.path.join(_scratch, "charts"))
+os.environ.setdefault("RENDER_WORKERS", "0")
+os.environ.setdefault("BCRYPT_ROUNDS", "4")
+
+
+@pytest.fixture(scope="session")
+def app_module():
+    import app as app_module
+
+    with app_module.app.app_context():
+        app_module.db.create_all()
+        user = app_module.User(email="tester@example.com", quota=50, approved=True)
+        user.set_password("tester-password")
+        app_module.db.session.add(user)
+        app_module.db.session.commit()
+    return app_module
+
+
+@pytest.fixture
+def client(app_module):
+    client = app_module.app.test_client()
+    with client.session_transaction() as session:
+        session["user"] = "tester@example.com"
+    return client
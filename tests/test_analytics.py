@@ -0,0 +1,14 @@
+import pytest
+
+from analytics import optimize_portfolio
+
+
+def test_optimize_respects_include_and_exclude():
+    result = optimize_portfolio([4, 3, 2], [10, 10, 10], 20, include=[2], exclude=[0])
+
+    assert result["selected"].tolist() == [False, True, True]
+
+
+def test_optimize_rejects_intervention_both_included_and_excluded():
+    with pytest.raises(ValueError, match=r"both included and excluded: \[1\]"):
+        optimize_portfolio([4, 3, 2], [10, 10, 10], 20, include=[1, 2], exclude=[0, 1])
@@ -0,0 +1,25 @@
+from charting import MaccRenderer, trajectory_limits
+
+VALUES = [[-20.0, -15.0, -10.0], [5.0, 8.0, 12.0], [30.0, 28.0, 25.0]]
+WIDTHS = [[1.0, 1.5, 2.0], [2.0, 2.0, 2.0], [1.0, 1.0, 0.5]]
+
+
+def test_trajectory_limits_cover_bars_and_zero():
+    low, high = trajectory_limits(VALUES)
+    assert low < -20.0 and high > 30.0
+
+
+def test_trajectory_limits_include_price_above_curve():
+    low, high = trajectory_limits(VALUES, line_value=100.0)
+    assert low < -20.0 and high > 100.0
+
+
+def test_trajectory_limits_include_price_below_curve():
+    low, high = trajectory_limits([[5.0, 6.0]], line_value=-50.0)
+    assert low < -50.0 and high > 6.0
+
+
+def test_render_trajectory_with_price_above_curve():
+    renderer = MaccRenderer.for_preset('thumbnail')
+    image = renderer.render_trajectory("Trajectory", ["A", "B", "C"], 2030, VALUES, WIDTHS, line_value=100.0)
+    assert image.startswith(b'\x89PNG')
@@ -0,0 +1,25 @@
+from rate_limiter import RateLimiter
+
+
+def test_burst_then_wait():
+    limiter = RateLimiter(rate_per_minute=60, burst=2)
+
+    assert limiter.acquire("a") == 0
+    assert limiter.acquire("a") == 0
+    wait = limiter.acquire("a")
+    assert 0 < wait <= 1
+    assert limiter.stats()["rejected"] == 1
+
+
+def test_keys_have_separate_buckets():
+    limiter = RateLimiter(rate_per_minute=1, burst=1)
+
+    assert limiter.acquire("a") == 0
+    assert limiter.acquire("a") > 0
+    assert limiter.acquire("b") == 0
+
+
+def test_zero_rate_disables_limit():
+    limiter = RateLimiter(rate_per_minute=0, burst=1)
+
+    assert all(limiter.acquire("a") == 0 for _ in range(100))
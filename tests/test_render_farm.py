@@ -0,0 +1,33 @@
+import os
+import signal
+import time
+from concurrent.futures.process import BrokenProcessPool
+
+from render_farm import RenderFarm
+
+SPEC = {
+    "project_name": "Farm test",
+    "categories": ["A", "B"],
+    "values": [-10.0, 25.0],
+    "widths": [2.0, 3.0],
+    "line_value": 10.0,
+}
+
+
+def test_render_recovers_after_idle_pool_process_dies():
+    farm = RenderFarm(workers=1, queue_size=2, timeout=60, start_method='fork')
+    assert farm.render(SPEC, 'thumbnail').startswith(b'\x89PNG')
+
+    for pid in list(farm._executor._processes):
+        os.kill(pid, signal.SIGKILL)
+    # Let the pool's management thread notice the dead process
+    time.sleep(1)
+
+    # The first submit may still see the broken pool; it must not stay broken
+    try:
+        image = farm.render(SPEC, 'thumbnail')
+    except BrokenProcessPool:
+        image = farm.render(SPEC, 'thumbnail')
+    assert image.startswith(b'\x89PNG')
+    assert farm.render(SPEC, 'thumbnail').startswith(b'\x89PNG')
+    assert farm.stats()["in_flight"] == 0
@@ -0,0 +1,78 @@
+import io
+import zipfile
+
+from rate_limiter import RateLimiter
+
+
+def user_quota(app_module):
+    with app_module.app.app_context():
+        return app_module.User.query.filter_by(email="tester@example.com").one().quota
+
+
+def test_uncertainty_without_values_is_rejected(client):
+    response = client.post("/uncertainty", data={"widths": "1,2", "line_value": "50"})
+
+    assert response.status_code == 400
+    assert "values are required" in response.get_json()["error"]
+
+
+def test_uncertainty_with_blank_widths_is_rejected(client):
+    response = client.post("/uncertainty", data={"values": "10,20", "widths": " ", "line_value": "50"})
+
+    assert response.status_code == 400
+    assert "widths are required" in response.get_json()["error"]
+
+
+def test_batch_rejects_scalar_column_with_line_number(client):
+    upload = (io.BytesIO(b'{"project_name": "p", "categories": "a", "values": 5, "widths": [1]}\n'), "batch.jsonl")
+    response = client.post("/batch", data={"file": upload}, content_type="multipart/form-data")
+
+    assert response.status_code == 400
+    assert "line 1: values must be" in response.get_json()["error"]
+
+
+def test_batch_refunds_quota_when_submit_fails(app_module, client, monkeypatch):
+    def broken_submit(*args, **kwargs):
+        raise RuntimeError("pool is gone")
+
+    monkeypatch.setattr(app_module.render_farm, "submit", broken_submit)
+    quota_before = user_quota(app_module)
+    line = b'{"project_name": "refund check", "categories": "a,b", "values": [3, 7], "widths": [1, 2]}\n'
+    response = client.post("/batch", data={"file": (io.BytesIO(line), "batch.jsonl")},
+                           content_type="multipart/form-data")
+
+    assert response.status_code == 200
+    with zipfile.ZipFile(io.BytesIO(response.get_data())) as archive:
+        assert archive.namelist() == ["errors.txt"]
+        assert "pool is gone" in archive.read("errors.txt").decode()
+    assert user_quota(app_module) == quota_before
+
+
+GEOMETRY_FORM = {"project_name": "preview", "categories": "a,b", "values": "-5,10", "widths": "1,2"}
+
+
+def test_geometry_preview_is_free(app_module, client, monkeypatch):
+    monkeypatch.setattr(app_module, "geometry_limiter", RateLimiter(rate_per_minute=60, burst=5))
+    quota_before = user_quota(app_module)
+
+    for _ in range(3):
+        assert client.post("/geometry", data=GEOMETRY_FORM).status_code == 200
+    assert user_quota(app_module) == quota_before
+
+
+def test_geometry_preview_is_rate_limited(app_module, client, monkeypatch):
+    monkeypatch.setattr(app_module, "geometry_limiter", RateLimiter(rate_per_minute=1, burst=1))
+
+    assert client.post("/geometry", data=GEOMETRY_FORM).status_code == 200
+    response = client.post("/geometry", data=GEOMETRY_FORM)
+    assert response.status_code == 429
+    assert 0 < int(response.headers["Retry-After"]) <= 60
+
+
+def test_optimize_names_interventions_both_included_and_excluded(client):
+    form = {"project_name": "portfolio", "categories": "Solar,Wind,Heat pumps", "values": "5,12,25",
+            "widths": "2,4,2.5", "budget": "100", "include": "Wind,Solar", "exclude": "Solar, Wind"}
+    response = client.post("/optimize", data=form)
+
+    assert response.status_code == 200
+    assert "interventions both included and excluded: Wind, Solar" in response.get_data(as_text=True)